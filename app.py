@@ -3,9 +3,9 @@ import PyPDF2
 import io
 import openpyxl
 import docx
-from dropbox_client import test_connection, get_dropbox_folders, get_subfolders, get_files_in_folder
+from dropbox_client import test_connection, get_dropbox_folders, get_all_folders, get_subfolders, get_files_in_folder
 from openai_client import test_openai_connection, process_user_instruction
-from file_searcher import search_files_comprehensive, download_file_content, extract_text_simple
+from file_searcher import search_files_comprehensive, search_files_federated, download_file_content, extract_text_simple
 from keyword_extractor import extract_keywords
 
 def search_from_filtered_files(filtered_files, user_input):
@@ -41,6 +41,19 @@ def search_from_filtered_files(filtered_files, user_input):
     
     return results
 
+@st.cache_data(ttl=600)
+def load_all_folders():
+    """全フォルダ一覧を取得（再帰取得は重いためキャッシュする。例外時はキャッシュされない）"""
+    return get_all_folders()
+
+def format_search_results(results):
+    """検索結果を番号付きリストの文字列に整形"""
+    text = ""
+    for i, result in enumerate(results, 1):
+        match_type = "ファイル名" if result['match_type'] == 'filename' else "内容"
+        text += f"{i}. {result['file']['name']} ({match_type}でマッチ)\n"
+    return text
+
 st.title("DropBox ファイル検索システム")
 
 # CSSファイルを読み込み
@@ -67,11 +80,34 @@ if folder_list:
     st.sidebar.write('🟢DropBox接続成功')
     st.sidebar.success(f"ユーザー名: {name}")
 
-    selected_folder = st.sidebar.selectbox(
-        "検索対象フォルダを選択",
-        folder_list,
-        index=0
-    )
+    # 複数フォルダ横断検索モード
+    federated_search = st.sidebar.toggle("🗂️ 複数フォルダ横断検索", value=False)
+
+    if federated_search:
+        try:
+            all_folders = load_all_folders()
+        except Exception as e:
+            st.sidebar.error(f"フォルダ一覧の取得に失敗しました: {e}")
+            all_folders = []
+        search_all_folders = st.sidebar.checkbox("アカウント全体を検索", value=False, disabled=not all_folders)
+        if search_all_folders and all_folders:
+            # ルート直下と全サブフォルダをシャードとして検索
+            search_folders = [""] + all_folders
+            selected_folder = "アカウント全体"
+        else:
+            search_folders = st.sidebar.multiselect(
+                "検索対象フォルダを選択（複数可）",
+                all_folders,
+                default=[folder for folder in folder_list[:1] if folder in all_folders]
+            )
+            selected_folder = "、".join(search_folders)
+    else:
+        selected_folder = st.sidebar.selectbox(
+            "検索対象フォルダを選択",
+            folder_list,
+            index=0
+        )
+        search_folders = [selected_folder]
     
     # 選択したフォルダのファイル一覧をMain画面に表示
     if selected_folder:
@@ -80,10 +116,15 @@ if folder_list:
             files = st.session_state.filtered_files
             st.markdown(f"##### 📂 {selected_folder} 内のファイル（絞り込み結果）")
             st.info(f"🔍 検索結果: {len(files)}件のファイルが表示されています")
+        elif federated_search:
+            # 横断検索では検索前のファイル一覧取得を省略
+            files = []
+            st.markdown(f"##### 📂 {selected_folder} 内のファイル")
+            st.info(f"🗂️ {len(search_folders)}個のフォルダを横断検索します")
         else:
             files = get_files_in_folder(selected_folder)
             st.markdown(f"##### 📂 {selected_folder} 内のファイル")
-        
+
         if files:
             st.write(f"ファイル数: {len(files)}個")
             
@@ -114,7 +155,7 @@ if folder_list:
         else:
             if st.session_state.filtered_files is not None:
                 st.warning("検索条件に一致するファイルがありません")
-            else:
+            elif not federated_search:
                 st.info("このフォルダにはサポートされているファイルがありません")
 
 else:
@@ -158,7 +199,17 @@ if prompt:
         search_term = "検索キーワードなし"
 
     # 統合検索
-    if st.session_state.filtered_files is None:
+    if st.session_state.filtered_files is None and federated_search:
+        # 初回検索（横断）：フォルダごとに並列検索し、完了したシャードから結果を表示
+        merged = []
+        partial_results = st.empty()
+        with st.sidebar.status(f"{len(search_folders)}個のフォルダを検索中...") as status:
+            for i, (folder_path, merged) in enumerate(search_files_federated(search_folders, prompt, keywords), 1):
+                status.write(f"✅ {folder_path or '/'}（{i}/{len(search_folders)}） 累計{len(merged)}件")
+                partial_results.markdown(f"##### 🔍 検索中の結果（{i}/{len(search_folders)}フォルダ完了）\n\n" + format_search_results(merged))
+            status.update(label=f"検索完了: {len(merged)}件", state="complete")
+        results = merged
+    elif st.session_state.filtered_files is None:
         # 初回検索：全ファイルから検索
         results = search_files_comprehensive(selected_folder, prompt)
     else:
@@ -170,9 +221,7 @@ if prompt:
         st.session_state.filtered_files = [result['file'] for result in results]
         
         response = f"検索結果: {len(results)}件のファイルが見つかりました\n\n"
-        for i, result in enumerate(results, 1):
-            match_type = "ファイル名" if result['match_type'] == 'filename' else "内容"
-            response += f"{i}. {result['file']['name']} ({match_type}でマッチ)\n"
+        response += format_search_results(results)
     else:
         response = "該当するファイルが見つかりませんでした"
     
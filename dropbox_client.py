@@ -33,6 +33,28 @@ def get_dropbox_folders(path=""):
         return []
 
 
+def get_all_folders(path=""):
+    """指定パス配下の全フォルダ一覧を再帰的に取得
+
+    取得エラーは呼び出し側で扱えるよう、例外をそのまま送出する。
+    """
+    dbx = get_dropbox_client()
+    
+    # サブフォルダも含めて再帰的に取得（ページングに対応）
+    result = dbx.files_list_folder(path, recursive=True)
+    folders = []
+    
+    while True:
+        for entry in result.entries:
+            if isinstance(entry, dropbox.files.FolderMetadata):
+                folders.append(entry.path_display)
+        if not result.has_more:
+            break
+        result = dbx.files_list_folder_continue(result.cursor)
+    
+    return sorted(folders)
+
+
 def get_subfolders(path=""):
     """指定パスのサブフォルダ一覧を取得"""
     dbx = get_dropbox_client()
@@ -73,7 +95,8 @@ def get_files_in_folder(path=""):
                         'name': entry.name,
                         'path': entry.path_display,
                         'size': entry.size,
-                        'modified': entry.server_modified
+                        'modified': entry.server_modified,
+                        'content_hash': entry.content_hash
                     })
         
         return files
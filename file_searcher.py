@@ -4,15 +4,31 @@ import PyPDF2
 import docx
 import openpyxl
 import xlrd # .xlsファイル対応のために追加
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dropbox_client import get_dropbox_client, get_files_in_folder 
 from keyword_extractor import extract_keywords
 
+# 統合結果の並び順（小さいほど上位）
+MATCH_TYPE_RANK = {'filename': 0, 'content': 1, 'exclude_filter': 2}
+
+def result_rank_key(result):
+    """統合結果の並び替えキー（一致種別、パスの順）"""
+    return (MATCH_TYPE_RANK.get(result['match_type'], len(MATCH_TYPE_RANK)), result['file']['path'])
+
+# 横断検索の並列数の上限（Dropbox APIのレート制限を考慮）
+MAX_FEDERATED_WORKERS = 16
+
 def search_files(folder_path, user_input):
     """指定フォルダ内でファイルを検索"""
     # キーワード抽出（関連度トップのみ）
     keywords = extract_keywords(user_input)
     print(f"Extracted keywords: {keywords}")  # デバッグ用
     
+    return search_files_with_keywords(folder_path, keywords)
+
+
+def search_files_with_keywords(folder_path, keywords):
+    """抽出済みキーワードで指定フォルダ内のファイル名を検索"""
     if not keywords:
         print("No keywords extracted")  # デバッグ用
         return []
@@ -50,11 +66,19 @@ def search_files(folder_path, user_input):
 
 def search_files_comprehensive(folder_path, user_input):
     """ファイル名と内容の両方で検索"""
+    # キーワード抽出（ファイル名検索と内容検索で共通）
+    keywords = extract_keywords(user_input)
+    
+    return search_files_comprehensive_with_keywords(folder_path, keywords)
+
+
+def search_files_comprehensive_with_keywords(folder_path, keywords):
+    """抽出済みキーワードでファイル名と内容の両方を検索"""
     # ファイル名検索
-    filename_results = search_files(folder_path, user_input)
+    filename_results = search_files_with_keywords(folder_path, keywords)
     
     # ファイル内容検索
-    content_results = search_files_by_content(folder_path, user_input)
+    content_results = search_files_by_content_with_keywords(folder_path, keywords)
     
     # 結果を統合（重複除去）
     all_results = filename_results + content_results
@@ -70,10 +94,62 @@ def search_files_comprehensive(folder_path, user_input):
     return unique_results
 
 
+def search_files_federated(folder_paths, user_input, keywords=None, max_workers=MAX_FEDERATED_WORKERS):
+    """複数フォルダをシャードに分けて並列検索し、途中結果を逐次返す
+
+    キーワードは一度だけ抽出し、全シャードで同じ検索語を使う。
+    シャード（フォルダ）ごとに search_files_comprehensive_with_keywords を
+    最大 max_workers 並列で実行し、完了したシャードから順に
+    (フォルダ, 統合済み結果) を yield する。
+    統合結果はファイルのcontent_hashで重複除去し（同一内容では一致種別が
+    上位のものを残す）、一致種別・パスの順に並べる。
+    """
+    merged_results = {}
+    
+    if not folder_paths:
+        return
+    
+    if keywords is None:
+        keywords = extract_keywords(user_input)
+    if not keywords:
+        return
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(folder_paths))) as executor:
+        futures = {
+            executor.submit(search_files_comprehensive_with_keywords, folder_path, keywords): folder_path
+            for folder_path in folder_paths
+        }
+        
+        for future in as_completed(futures):
+            folder_path = futures[future]
+            try:
+                shard_results = future.result()
+            except Exception as e:
+                print(f"シャード検索エラー ({folder_path}): {e}")
+                shard_results = []
+            
+            # 結果を統合（同一内容のファイルは一致種別が上位のものを残す）
+            for result in shard_results:
+                file_hash = result['file'].get('content_hash') or result['file']['path']
+                current = merged_results.get(file_hash)
+                if current is None or result_rank_key(result) < result_rank_key(current):
+                    merged_results[file_hash] = result
+            
+            # ファイル名一致を内容一致より上位に並べ、同順位はパス順で固定する
+            ranked_results = sorted(merged_results.values(), key=result_rank_key)
+            yield folder_path, ranked_results
+
+
 def search_files_by_content(folder_path, user_input):
     """ファイル内容で検索"""
     # キーワード抽出（関連度トップのみ）
     keywords = extract_keywords(user_input)
+    
+    return search_files_by_content_with_keywords(folder_path, keywords)
+
+
+def search_files_by_content_with_keywords(folder_path, keywords):
+    """抽出済みキーワードでファイル内容を検索"""
     if not keywords:
         return []
     